@@ -2,24 +2,26 @@
 import re
 import sys
 
-PACKAGE_REGEX = r"^[_a-zA-Z][_a-zA-Z0-9-]+$"
-package_name = "{{ cookiecutter.project_name }}"
-
-if not re.match(PACKAGE_REGEX, package_name):
-    print(
-        f"ERROR: The project name {package_name} is not a valid Python package name.  Please use letters and - or _ only."
-    )
+PACKAGE_REGEX = re.compile(r"[_a-zA-Z][_a-zA-Z0-9-]+")
+MODULE_REGEX = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]+")
 
-    # Exit to cancel project
-    sys.exit(1)
-
-MODULE_REGEX = r"^[_a-zA-Z][_a-zA-Z0-9]+$"
+package_name = "{{ cookiecutter.project_name }}"
 module_name = "{{ cookiecutter.project_slug}}"
 
-if not re.match(MODULE_REGEX, module_name):
-    print(
-        f"ERROR: The project slug {module_name} is not a valid Python module name. Please do not use a - and use _ instead."
-    )
+for name, regex, msg in (
+    (
+        package_name,
+        PACKAGE_REGEX,
+        f"ERROR: The project name {package_name} is not a valid Python package name.  Please use letters and - or _ only.",
+    ),
+    (
+        module_name,
+        MODULE_REGEX,
+        f"ERROR: The project slug {module_name} is not a valid Python module name. Please do not use a - and use _ instead.",
+    ),
+):
+    if not regex.fullmatch(name):
+        print(msg)
 
-    # Exit to cancel project
-    sys.exit(1)
+        # Exit to cancel project
+        sys.exit(1)
@@ -1,34 +1,26 @@
-from contextlib import contextmanager
-import shlex
 import os
 import subprocess
+import sys
 from cookiecutter.utils import rmtree
 
 from pathlib import Path
 
+import pytest
 
-@contextmanager
-def inside_dir(dirpath):
-    """
-    Execute code from inside the given directory
-    :param dirpath: String, path of the directory the command is being run.
-    """
-    old_path = os.getcwd()
-    try:
-        os.chdir(dirpath)
-        yield
-    finally:
-        os.chdir(old_path)
+CURRENT_PYTHON = "{}.{}".format(*sys.version_info[:2])
+DEFAULT_PYTHON = "3.10"
 
 
-def run_inside_dir(command, dirpath):
+def run_inside_dir(args, dirpath, env=None):
     """
     Run a command from inside a given directory, returning the exit status
-    :param command: Command that will be executed
+    :param args: Sequence of command arguments that will be executed
     :param dirpath: String, path of the directory the command is being run.
+    :param env: Optional mapping of extra environment variables.
     """
-    with inside_dir(dirpath):
-        return subprocess.check_call(shlex.split(command))
+    if env is not None:
+        env = {**os.environ, **env}
+    return subprocess.run(args, cwd=dirpath, env=env, check=True).returncode
 
 
 # @contextmanager
@@ -45,10 +37,9 @@ def run_inside_dir(command, dirpath):
 #         rmtree(str(result.project))
 
 
-# def check_output_inside_dir(command, dirpath):
+# def check_output_inside_dir(args, dirpath):
 #     "Run a command from inside a given directory, returning the command output"
-#     with inside_dir(dirpath):
-#         return subprocess.check_output(shlex.split(command))
+#     return subprocess.check_output(args, cwd=dirpath)
 
 
 # def project_info(result):
@@ -61,89 +52,100 @@ def run_inside_dir(command, dirpath):
 
 # * Actual testing
 # ** Utilities
+DEFAULT_FILES = frozenset(
+    [
+        ".editorconfig",
+        ".gitignore",
+        ".markdownlint.yaml",
+        ".pre-commit-config.yaml",
+        ".prettierrc.yaml",
+        "pyproject.toml",
+        "noxfile.py",
+        "CHANGELOG.md",
+        "CONTRIBUTING.md",
+        "LICENSE",
+        "MANIFEST.in",
+        "Makefile",
+        "README.md",
+        "AUTHORS.md",
+    ]
+)
+
+DEFAULT_DIRECTORIES = frozenset(
+    [
+        ".github",
+        "changelog.d",
+        "config",
+        "docs",
+        "examples",
+        "requirements",
+        "src",
+        "tests",
+        "tools",
+    ]
+)
+
+
 def check_directory(
     path, extra_files=None, extra_directories=None, files=None, directories=None
 ):
     """Check path for files and directories"""
     path = Path(path)
 
-    if files is None:
-        files = [
-            ".editorconfig",
-            ".gitignore",
-            ".markdownlint.yaml",
-            ".pre-commit-config.yaml",
-            ".prettierrc.yaml",
-            "pyproject.toml",
-            "noxfile.py",
-            "CHANGELOG.md",
-            "CONTRIBUTING.md",
-            "LICENSE",
-            "MANIFEST.in",
-            "Makefile",
-            "README.md",
-            "AUTHORS.md",
-        ]
-
-    if directories is None:
-        directories = [
-            ".github",
-            "changelog.d",
-            "config",
-            "docs",
-            "examples",
-            "requirements",
-            "src",
-            "tests",
-            "tools",
-        ]
-
     def _add_extras(x, extras):
+        x = frozenset(x)
         if extras is None:
             return x
         elif isinstance(extras, str):
-            return x + [extras]
+            return x | {extras}
         else:
-            return x + list(extras)
-
-    files = _add_extras(files, extra_files)
-    directories = _add_extras(directories, extra_directories)
-
-    found_files = []
-    found_directories = []
+            return x.union(extras)
 
-    for p in Path(path).iterdir():
-        if p.is_dir():
-            found_directories.append(p.name)
-        else:
-            found_files.append(p.name)
-
-    assert set(files) == set(found_files)
-    assert set(directories) == set(found_directories)
+    files = _add_extras(DEFAULT_FILES if files is None else files, extra_files)
+    directories = _add_extras(
+        DEFAULT_DIRECTORIES if directories is None else directories, extra_directories
+    )
 
+    found_files = set()
+    found_directories = set()
 
-def get_python_version():
-    import sys
+    # DirEntry.is_dir uses the cached entry type, avoiding a stat per entry
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                found_directories.add(entry.name)
+            else:
+                found_files.add(entry.name)
 
-    return "{}.{}".format(*sys.version_info[:2])
+    assert files == found_files
+    assert directories == found_directories
 
 
 def run_nox_tests(path, test=True, docs=True, lint=True):
     path = str(path)
-    py = get_python_version()
-
-    run_inside_dir("nox -s requirements", path)
+    py = CURRENT_PYTHON
 
+    # sessions without posargs share a single nox invocation
+    sessions = ["requirements"]
     if test:
-        run_inside_dir(f"nox -s test-venv-{py}", path)
+        sessions.append(f"test-venv-{py}")
+    run_inside_dir(
+        ["nox", "-s", *sessions],
+        path,
+        # plugins the baked test run does not need.  Keep any user supplied options.
+        env={
+            "PYTEST_ADDOPTS": os.environ.get("PYTEST_ADDOPTS", "")
+            + " -p no:cacheprovider -p no:sugar --no-header"
+        },
+    )
 
     if lint:
-        run_inside_dir("git init", path)
-        run_inside_dir("git add .", path)
-        run_inside_dir(f"nox -s lint", path)
+        run_inside_dir(["git", "init", "-q"], path)
+        run_inside_dir(["git", "add", "."], path)
+        run_inside_dir(["nox", "-s", "lint"], path)
 
-    if docs and py == "3.10":
-        run_inside_dir(f"nox -s docs-venv -- -d symlink build", path)
+    if docs and py == DEFAULT_PYTHON:
+        run_inside_dir(["nox", "-s", "docs-venv", "--", "-d", "symlink", "build"], path)
 
 
 # ** fixtures
@@ -153,29 +155,17 @@ def run_nox_tests(path, test=True, docs=True, lint=True):
 
 
 # ** tests
-def test_bake_and_run_tests_default(cookies):
-    result = cookies.bake()
-    # test directory structure
-    check_directory(result.project_path)
-
-    # test nox
-    run_nox_tests(result.project_path)
-
-
-def test_bake_and_run_tests_with_furo(cookies):
-    result = cookies.bake(
-        extra_context={"sphinx_theme": "furo", "command_line_interface": "Click"}
-    )
-
-    # test directory structure
-    check_directory(result.project_path)
-
-    # test nox
-    run_nox_tests(result.project_path)
-
-
-def test_bake_and_run_tests_with_typer(cookies):
-    result = cookies.bake(extra_context={"command_line_interface": "Typer"})
+@pytest.mark.parametrize(
+    "extra_context",
+    [
+        {},
+        {"sphinx_theme": "furo", "command_line_interface": "Click"},
+        {"command_line_interface": "Typer"},
+    ],
+    ids=["default", "furo", "typer"],
+)
+def test_bake_and_run_tests(cookies, extra_context):
+    result = cookies.bake(extra_context=extra_context)
 
     # test directory structure
     check_directory(result.project_path)
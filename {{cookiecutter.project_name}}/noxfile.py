@@ -2,6 +2,7 @@
 # * Imports ----------------------------------------------------------------------------
 from __future__ import annotations
 
+import os
 import shutil
 import sys
 from dataclasses import replace  # noqa
@@ -24,14 +25,18 @@ from noxopt import NoxOpt, Option, Session
 sys.path.insert(0, ".")
 from tools.noxtools import (
     combine_list_str,
+    env_unchanged,
+    get_hashes,
     load_nox_config,
     open_webpage,
     pkg_install_condaenv,
     pkg_install_venv,
     prepend_flag,
     session_run_commands,
+    session_tmp_path,
     sort_like,
     update_target,
+    write_hashfile,
 )
 
 sys.path.pop(0)
@@ -61,6 +66,7 @@ CONFIG = load_nox_config()
 
 # * Options ----------------------------------------------------------------------------
 
+# NOTE: Makefile reads this line (single line list) for its test-<version> targets.
 PYTHON_ALL_VERSIONS = ["3.8", "3.9", "3.10", "3.11"]
 PYTHON_DEFAULT_VERSION = "3.10"
 
@@ -88,6 +94,8 @@ ALL_SESSION = cast(C[F], group.session(**SESSION_ALL_KWS))  # type: ignore
 DEFAULT_SESSION_VENV = cast(C[F], group.session(python=PYTHON_DEFAULT_VERSION))  # type: ignore
 ALL_SESSION_VENV = cast(C[F], group.session(python=PYTHON_ALL_VERSIONS))  # type: ignore
 
+NO_PYTHON_SESSION = cast(C[F], group.session(python=False))  # type: ignore
+
 OPTS_OPT = Option(nargs="*", type=str)
 # SET_KERNEL_OPT = Option(type=bool, help="If True, try to set the kernel name")
 RUN_OPT = Option(
@@ -192,7 +200,7 @@ def dev_venv(
 
 
 # ** bootstrap
-@group.session(python=False)  # type: ignore
+@NO_PYTHON_SESSION
 def bootstrap(session: Session):
     """Run config, reqs, and dev"""
 
@@ -202,7 +210,7 @@ def bootstrap(session: Session):
 
 
 # ** config
-@group.session(python=False)  # type: ignore
+@NO_PYTHON_SESSION
 def config(
     session: Session,
     dev_extras: DEV_EXTRAS_CLI = [],  # type: ignore # noqa
@@ -220,7 +228,7 @@ def config(
 
 
 # ** requirements
-@group.session(python=False)  # type: ignore
+@NO_PYTHON_SESSION
 def pyproject2conda(
     session: Session,
     update: UPDATE_CLI = False,
@@ -249,6 +257,20 @@ def requirements(
         log_session=log_session,
     )
 
+    def _paths() -> list[Path]:
+        reqs_dir = Path("./requirements")
+        return [
+            Path("pyproject.toml"),
+            *sorted(reqs_dir.glob("*.txt")),
+            *sorted(reqs_dir.glob("*.yaml")),
+        ]
+
+    # skip if neither pyproject.toml nor the generated files changed since last run
+    unchanged, _ = env_unchanged(session, *_paths(), prefix="reqs")
+    if unchanged and not (update or requirements_force):
+        session.log("Requirements up to date.  Pass `--requirements-force` to rerun.")
+        return
+
     session.run(
         "pyproject2conda",
         "project",
@@ -256,6 +278,8 @@ def requirements(
         *(["--overwrite", "force"] if requirements_force else []),
     )
 
+    write_hashfile(get_hashes(*_paths()), session=session, prefix="reqs")
+
 
 # ** conda-lock
 @DEFAULT_SESSION_VENV
@@ -315,8 +339,7 @@ def conda_lock(
         if conda_lock_force or update_target(lockfile, *deps):
             session.log(f"Creating {lockfile}")
             # insert -f for each arg
-            if lockfile.exists():
-                lockfile.unlink()
+            lockfile.unlink(missing_ok=True)
             session.run(
                 "conda-lock",
                 "--mamba" if conda_lock_mamba else "--no-mamba",
@@ -345,8 +368,8 @@ def _test(
     if not test_no_pytest:
         opts = combine_list_str(test_opts)
         if not no_cov:
-            session.env["COVERAGE_FILE"] = str(Path(session.create_tmp()) / ".coverage")
-            if "--cov" not in opts:
+            session.env["COVERAGE_FILE"] = str(session_tmp_path(session) / ".coverage")
+            if not any(opt == "--cov" or opt.startswith("--cov=") for opt in opts):
                 opts.append("--cov")
         session.run("pytest", *opts)
 
@@ -414,6 +437,16 @@ def test_venv(
 
 
 # ** coverage
+_COVERAGE_SCRIPT = """\
+import sys
+from coverage.cmdline import main
+
+for c in sys.argv[1:]:
+    if status := main([c]):
+        sys.exit(status)
+"""
+
+
 def _coverage(
     session: nox.Session,
     run: list[list[str]],
@@ -427,17 +460,29 @@ def _coverage(
 
     session.log(f"{cmd}")
 
+    # Consecutive plain commands (erase, report, html, ...) share a single
+    # interpreter instead of starting `coverage` once per command.
+    pending: list[str] = []
+
+    def _flush() -> None:
+        if pending:
+            session.run("python", "-c", _COVERAGE_SCRIPT, *pending)
+            pending.clear()
+
     for c in cmd:
         if c == "combine":
+            _flush()
             paths = list(
                 Path(session.virtualenv.location).parent.glob("test-3*/tmp/.coverage")
             )
             if update_target(".coverage", *paths):
                 session.run("coverage", "combine", "--keep", "-a", *map(str, paths))
         elif c == "open":
+            _flush()
             open_webpage(path="htmlcov/index.html")
         else:
-            session.run("coverage", c)
+            pending.append(c)
+    _flush()
 
     session_run_commands(session, run_internal, external=False)
 
@@ -745,9 +790,7 @@ def dist_conda(
                 _append_recipe(
                     f"dist-conda/{PACKAGE_NAME}/meta.yaml", "config/recipe-append.yaml"
                 )
-                session.run(
-                    "cat", f"dist-conda/{PACKAGE_NAME}/meta.yaml", external=True
-                )
+                session.log(Path(f"dist-conda/{PACKAGE_NAME}/meta.yaml").read_text())
             elif command == "recipe-cat-full":
                 import tempfile
 
@@ -759,9 +802,7 @@ def dist_conda(
                         "-o",
                         d,
                     )
-                    session.run(
-                        "cat", str(Path(d) / PACKAGE_NAME / "meta.yaml"), external=True
-                    )
+                    session.log((Path(d) / PACKAGE_NAME / "meta.yaml").read_text())
 
             elif command == "build":
                 session.run(
@@ -818,10 +859,13 @@ def _typing(
         cmd = ["mypy", "pyright", "pytype"]
 
     # set the cache directory for mypy
-    session.env["MYPY_CACHE_DIR"] = str(Path(session.create_tmp()) / ".mypy_cache")
+    session.env["MYPY_CACHE_DIR"] = str(session_tmp_path(session) / ".mypy_cache")
+
+    # look up commands in-process (on the session PATH) rather than spawning `which`
+    path = os.pathsep.join([*(session.bin_paths or []), os.environ.get("PATH", "")])
 
     def _run_info(cmd: str) -> None:
-        session.run("which", cmd, external=True)
+        session.log(f"{cmd}: {shutil.which(cmd, path=path)}")
         session.run(cmd, "--version", external=True)
 
     for c in cmd:
@@ -832,7 +876,7 @@ def _typing(
         elif c == "pyright":
             session.run("pyright", external=True)
         elif c == "pytype":
-            session.run("pytype", "-o", str(Path(session.create_tmp()) / ".pytype"))
+            session.run("pytype", "-o", str(session_tmp_path(session) / ".pytype"))
         elif c.startswith("nbqa"):
             session.run("make", c, external=True)
         else:
@@ -1046,8 +1090,6 @@ def testdist_pypi_condaenv(
 def _create_doc_examples_symlinks(session: nox.Session, clean: bool = True) -> None:
     """Create symlinks from docs/examples/*.md files to /examples/usage/..."""
 
-    import os
-
     def usage_paths(path: Path) -> Iterator[Path]:
         with path.open("r") as f:
             for line in f:
@@ -1088,8 +1130,8 @@ def _create_doc_examples_symlinks(session: nox.Session, clean: bool = True) -> N
             target = get_target_path(usage_path)
             link = root / usage_path.parent / target.name
 
-            if link.exists():
-                link.unlink()
+            # also removes broken symlinks, which `exists()` reports as missing
+            link.unlink(missing_ok=True)
 
             link.parent.mkdir(parents=True, exist_ok=True)
 
@@ -1099,15 +1141,11 @@ def _create_doc_examples_symlinks(session: nox.Session, clean: bool = True) -> N
             os.symlink(target_rel, link)
 
 
-def _append_recipe(recipe_path: str, append_path: str) -> None:
-    with open(recipe_path) as f:
-        recipe = f.readlines()
-
-    with open(append_path) as f:
-        append = f.readlines()
-
-    with open(recipe_path, "w") as f:
-        f.writelines(recipe + ["\n"] + append)
+def _append_recipe(recipe_path: str | Path, append_path: str | Path) -> None:
+    recipe_path = Path(recipe_path)
+    recipe_path.write_bytes(
+        recipe_path.read_bytes() + b"\n" + Path(append_path).read_bytes()
+    )
 
 
 # # If want separate env for updating/reporting version with setuptools-scm
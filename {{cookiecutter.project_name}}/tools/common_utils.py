@@ -1,6 +1,12 @@
 """Utilities for tools."""
 from __future__ import annotations
 
+import re
+
+# "name [*] path" lines from `conda env list`.  Comments and unnamed
+# (path only) environments don't match.
+_CONDA_ENV_LINE = re.compile(rb"^([^\s#*]+)[ \t]+\*?[ \t]*(\S+)[ \t\r]*$", re.MULTILINE)
+
 
 def get_conda_environment_map(simplify: bool = True) -> dict[str, str]:
     """Contruct mapping from environment env_name to path"""
@@ -9,17 +15,14 @@ def get_conda_environment_map(simplify: bool = True) -> dict[str, str]:
 
     result = subprocess.check_output(["conda", "env", "list"])
 
-    env_map = {}
-    for line in result.decode().split("\n"):
-        if not line.startswith("#"):
-            x = line.replace("*", "").split()
-            n = len(x)
-            if n == 1:
-                # this is path environment
-                pass
-            elif n == 2:
-                env_map[x[0]] = x[1]
     if simplify:
-        home = str(Path.home())
-        env_map = {k: v.replace(home, "~") for k, v in env_map.items()}
-    return env_map
+        home = str(Path.home()).encode()
+        return {
+            name.decode(): path.replace(home, b"~").decode()
+            for name, path in _CONDA_ENV_LINE.findall(result)
+        }
+    else:
+        return {
+            name.decode(): path.decode()
+            for name, path in _CONDA_ENV_LINE.findall(result)
+        }
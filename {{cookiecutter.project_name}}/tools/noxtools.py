@@ -2,16 +2,16 @@
 
 from __future__ import annotations
 
-import shlex
+import os
+import re
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Iterable, Literal, Sequence, TextIO, cast
 
-from ruamel.yaml import safe_load
-
 if TYPE_CHECKING:
     from collections.abc import Collection
 
     import nox
+    from ruamel.yaml import YAML
 
 
 # * Top level installation functions ---------------------------------------------------
@@ -39,10 +39,11 @@ def session_environment_filename(
         filename = f"{py_prefix(python_version)}-{filename}"
 
     if lock:
+        # NOTE: slice rather than rstrip, which strips characters, not a suffix
         if filename.endswith(".yaml"):
-            filename = filename.rstrip(".yaml") + "-conda-lock.yml"
+            filename = filename[: -len(".yaml")] + "-conda-lock.yml"
         elif filename.endswith(".yml"):
-            filename = filename.rstrip(".yml") + "-conda-lock.yml"
+            filename = filename[: -len(".yml")] + "-conda-lock.yml"
         elif filename.endswith(".txt"):
             pass
         else:
@@ -81,7 +82,7 @@ def pkg_install_condaenv(
     )
 
     if lock:
-        session_install_envs_lock(
+        unchanged = session_install_envs_lock(
             session=session,
             lockfile=check_filename(filename),
             display_name=display_name,
@@ -91,7 +92,7 @@ def pkg_install_condaenv(
         )
 
     else:
-        session_install_envs(
+        unchanged = session_install_envs(
             session,
             check_filename(filename),
             display_name=display_name,
@@ -104,7 +105,7 @@ def pkg_install_condaenv(
         )
 
     if log_session:
-        session_log_session(session, conda=True)
+        session_log_session(session, conda=True, unchanged=unchanged and not update)
 
 
 def pkg_install_venv(
@@ -124,7 +125,7 @@ def pkg_install_venv(
     if lock:
         raise ValueError("lock not yet supported for install_pip")
 
-    session_install_pip(
+    unchanged = session_install_pip(
         session=session,
         requirement_paths=requirement_paths,
         constraint_paths=constraint_paths,
@@ -138,11 +139,23 @@ def pkg_install_venv(
     )
 
     if log_session:
-        session_log_session(session, conda=False)
+        session_log_session(session, conda=False, unchanged=unchanged and not update)
+
+
+def session_log_session(
+    session: nox.Session, conda: bool = True, unchanged: bool = False
+) -> None:
+    """
+    Write environment info to session tmp directory.
 
+    If `unchanged`, an existing log is kept, as listing the environment
+    (`conda list` in particular) can be slow.
+    """
+    logfile = session_tmp_path(session) / "env_info.txt"
 
-def session_log_session(session: nox.Session, conda: bool = True) -> None:
-    logfile = Path(session.create_tmp()) / "env_info.txt"
+    if unchanged and logfile.exists():
+        session.log(f"environment unchanged, keeping {logfile}")
+        return
 
     session.log(f"writing environment log to {logfile}")
 
@@ -177,11 +190,27 @@ def load_nox_config(path: str | Path = "./config/userconfig.toml") -> dict[str,
 
 
 # * Basic utilities --------------------------------------------------------------------
+_QUOTE_CHARS = frozenset("\"'\\")
+_SPLIT_CHARS = _QUOTE_CHARS.union(" \t\n\r\f\v")
+# tokens between shlex whitespace (str.split also splits on \f, \v, unicode spaces)
+_SHLEX_TOKEN = re.compile(r"[^ \t\r\n]+")
+
+
 def combine_list_str(opts: list[str]) -> list[str]:
-    if opts:
-        return shlex.split(" ".join(opts))
-    else:
+    if not opts:
         return []
+    elif all(opt and _SPLIT_CHARS.isdisjoint(opt) for opt in opts):
+        # already a list of single tokens
+        return list(opts)
+
+    joined = " ".join(opts)
+    if _QUOTE_CHARS.isdisjoint(joined):
+        # no quoting, so shlex would split on whitespace only
+        return _SHLEX_TOKEN.findall(joined)
+    else:
+        import shlex
+
+        return shlex.split(joined)
 
 
 def combine_list_list_str(opts: list[list[str]]) -> Iterable[list[str]]:
@@ -199,23 +228,21 @@ def update_target(
     target: str | Path, *deps: str | Path, allow_missing: bool = False
 ) -> bool:
     """Check if target is older than deps:"""
-    target = Path(target)
-
-    deps_filtered = []
-    for d in map(Path, deps):
-        if d.exists():
-            deps_filtered.append(d)
-        elif not allow_missing:
-            raise ValueError(f"dependency {d} does not exist")
-
-    if not target.exists():
+    # single stat per path
+    dep_times = []
+    for d in deps:
+        try:
+            dep_times.append(os.stat(d).st_mtime)
+        except FileNotFoundError:
+            if not allow_missing:
+                raise ValueError(f"dependency {d} does not exist") from None
+
+    try:
+        target_time = os.stat(target).st_mtime
+    except FileNotFoundError:
         return True
-    else:
-        target_time = target.stat().st_mtime
 
-        update = any(target_time < dep.stat().st_mtime for dep in deps_filtered)
-
-    return update
+    return any(target_time < t for t in dep_times)
 
 
 def prepend_flag(flag: str, *args: str | Sequence[str]) -> list[str]:
@@ -226,14 +253,12 @@ def prepend_flag(flag: str, *args: str | Sequence[str]) -> list[str]:
     ["-k", "a", "-k", "b"]
     """
 
-    args_ = []
-    for x in args:
-        if isinstance(x, str):
-            args_.append(x)
-        else:
-            args_.extend(x)
-
-    return sum([[flag, _] for _ in args_], [])
+    return [
+        t
+        for arg in args
+        for x in ((arg,) if isinstance(arg, str) else arg)
+        for t in (flag, x)
+    ]
 
 
 def open_webpage(path: str | Path | None = None, url: str | None = None) -> None:
@@ -261,6 +286,16 @@ def session_skip_install(session: nox.Session) -> bool:
     return session._runner.global_config.no_install and session._runner.venv._reused  # type: ignore
 
 
+def session_tmp_path(session: nox.Session) -> Path:
+    """
+    Path to session tmp directory.
+
+    Not cached: each run of a session gets a fresh environment (TMPDIR), and
+    the directory is removed if the venv is recreated.
+    """
+    return Path(session.create_tmp())
+
+
 def session_run_commands(
     session: nox.Session, commands: list[list[str]], external: bool = True, **kws: Any
 ) -> None:
@@ -333,7 +368,7 @@ def session_install_envs_lock(
     if extras:
         if isinstance(extras, str):
             extras = extras.split(",")
-        extras = cast(list[str], sum([["--extras", _] for _ in extras], []))
+        extras = prepend_flag("--extras", extras)
     else:
         extras = []
 
@@ -360,54 +395,76 @@ def session_install_envs_lock(
 
 
 # ** Conda
+_PYTHON_MATCH = re.compile(r"\s*(python)\s*[~<=>].*")
+
+
+def _stat_key(path: str | Path) -> tuple[str, int, int]:
+    """
+    Key for per-file caches shared by all sessions in a nox run.
+
+    Includes modification time and size, so edited files are picked up.
+    """
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+_ENV_YAML_CACHE: dict[tuple[str, int, int], dict[str, Any]] = {}
+
+
+def _load_env_yaml(yaml: YAML, path: str | Path) -> dict[str, Any]:
+    key = _stat_key(path)
+    try:
+        return _ENV_YAML_CACHE[key]
+    except KeyError:
+        with open(path) as f:
+            data = _ENV_YAML_CACHE[key] = yaml.load(f)
+        return data
+
+
 def parse_envs(
-    *paths: str | Path,
+    *paths: str | Path | TextIO,
     remove_python: bool = True,
     deps: Collection[str] | None = None,
     reqs: Collection[str] | None = None,
     channels: Collection[str] | None = None,
 ) -> tuple[set[str], set[str], set[str], str | None]:
     """Parse an `environment.yaml` file."""
-    import re
 
-    def _default(x: str | Iterable[str] | None) -> set[str]:
+    def _default(x: str | Iterable[str] | None) -> list[str]:
         if x is None:
-            return set()
+            return []
         elif isinstance(x, str):
-            x = [x]
-        return set(x)
+            return [x]
+        return list(x)
 
-    channels = _default(channels)
-    deps = _default(deps)
-    reqs = _default(reqs)
+    # collect into lists and dedupe once at the end
+    channels_ = _default(channels)
+    deps_ = _default(deps)
+    reqs_ = _default(reqs)
     name = None
 
-    python_match = re.compile(r"\s*(python)\s*[~<=>].*")
-
-    def _get_context(path: str | Path | TextIO) -> TextIO | Path:
-        if hasattr(path, "readline"):
-            from contextlib import nullcontext
-
-            return nullcontext(path)  # type: ignore
-        else:
-            return Path(path).open("r")
+    from ruamel.yaml import YAML
 
+    # one loader for all paths.  typ="safe" uses the C loader if available.
+    yaml = YAML(typ="safe")
+    match_python = _PYTHON_MATCH.match
     for path in paths:
-        with _get_context(path) as f:
-            data = safe_load(f)
+        if isinstance(path, (str, Path)):
+            data = _load_env_yaml(yaml, path)
+        else:
+            data = yaml.load(path)
 
-        channels.update(data.get("channels", []))
+        channels_.extend(data.get("channels", []))
         name = data.get("name", name)
 
         # check dependencies for pip
         for d in data.get("dependencies", []):
             if isinstance(d, dict):
-                reqs.update(cast(list[str], d.get("pip")))
-            else:
-                if remove_python and not python_match.match(d):
-                    deps.add(d)
+                reqs_.extend(cast(list[str], d.get("pip")))
+            elif remove_python and not match_python(d):
+                deps_.append(d)
 
-    return channels, deps, reqs, name
+    return set(channels_), set(deps_), set(reqs_), name
 
 
 def session_install_envs(
@@ -455,13 +512,13 @@ def session_install_envs(
         conda_install_kws = conda_install_kws or {}
         conda_install_kws.update(channel=channels)
         if update:
-            deps = ["--update-all"] + list(deps)
+            deps = ["--update-all", *deps]
 
         session.conda_install(*deps, **(conda_install_kws or {}))
 
     if reqs:
         if update:
-            reqs = ["--upgrade"] + list(reqs)
+            reqs = ["--upgrade", *reqs]
         session.install(*reqs, **(install_kws or {}))
 
     if install_package:
@@ -475,6 +532,21 @@ def session_install_envs(
 
 
 # ** Pip
+# Paths known to exist.  Only positive results are kept, as files may be created
+# by an earlier session (e.g., requirements) in the same nox run.
+_EXISTING_PATHS: set[str] = set()
+
+
+def _path_exists(path: str) -> bool:
+    if path in _EXISTING_PATHS:
+        return True
+    elif os.path.exists(path):
+        _EXISTING_PATHS.add(path)
+        return True
+    else:
+        return False
+
+
 def session_install_pip(
     session: nox.Session,
     requirement_paths: str | Collection[str] | None = None,
@@ -506,11 +578,11 @@ def session_install_pip(
 
         out = []
         for path in paths:
-            if Path(path).exists():
+            if _path_exists(path):
                 out.append(path)
             else:
                 inferred = session_environment_filename(name=path, lock=lock)
-                if Path(inferred).exists():
+                if _path_exists(inferred):
                     out.append(inferred)
                 else:
                     raise ValueError(f"no file {path} found/inferred")
@@ -549,15 +621,15 @@ def session_install_pip(
         return unchanged
 
     # do install
-    install_args = (
-        prepend_flag("-r", *requirement_paths)
-        + prepend_flag("-c", *constraint_paths)
-        + list(reqs)
-    )
+    install_args = [
+        *prepend_flag("-r", *requirement_paths),
+        *prepend_flag("-c", *constraint_paths),
+        *reqs,
+    ]
 
     if install_args:
         if update:
-            install_args = ["--upgrade"] + list(install_args)
+            install_args.insert(0, "--upgrade")
         session.install(*install_args)
 
     if install_package:
@@ -571,7 +643,7 @@ def session_install_pip(
 
 # ** Hash environment
 
-PREFIX_HASH_EXTS = Literal["env", "lock", "pip"]
+PREFIX_HASH_EXTS = Literal["env", "lock", "pip", "reqs"]
 
 
 def env_unchanged(
@@ -587,12 +659,14 @@ def env_unchanged(
     if hashes is None:
         hashes = get_hashes(*paths, other=other)
 
-    if hashfile.exists():
+    try:
+        previous = read_hashfile(hashfile)
+    except FileNotFoundError:
+        unchanged = False
+    else:
         if verbose:
             session.log(f"hash file {hashfile} exists")
-        unchanged = hashes == read_hashfile(hashfile)
-    else:
-        unchanged = False
+        unchanged = hashes == previous
 
     if unchanged:
         session.log(f"session {session.name} unchanged")
@@ -606,7 +680,7 @@ def get_hashes(
     *paths: str | Path,
     other: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """Get md5 hashes for paths."""
+    """Get blake2b hashes for paths."""
 
     out: dict[str, Any] = {"path": {str(path): _get_file_hash(path) for path in paths}}
 
@@ -622,7 +696,7 @@ def get_hashes(
                     s = str(sorted(v))
                 except Exception:
                     s = str(v)
-            other_hashes[k] = hashlib.md5(s.encode("utf-8")).hexdigest()
+            other_hashes[k] = hashlib.blake2b(s.encode("utf-8")).hexdigest()
 
         out["other"] = other_hashes
 
@@ -631,7 +705,7 @@ def get_hashes(
 
 def hashfile_path(session: nox.Session, prefix: PREFIX_HASH_EXTS) -> Path:
     """Path for hashfile for this session."""
-    return Path(session.create_tmp()) / f"{prefix}.json"
+    return session_tmp_path(session) / f"{prefix}.json"
 
 
 def write_hashfile(
@@ -657,17 +731,33 @@ def read_hashfile(
     return cast(dict[str, str], data)
 
 
+_FILE_HASH_CACHE: dict[tuple[str, int, int], str] = {}
+
+
 def _get_file_hash(path: str | Path, buff_size: int = 65536) -> str:
+    key = _stat_key(path)
+    try:
+        return _FILE_HASH_CACHE[key]
+    except KeyError:
+        out = _FILE_HASH_CACHE[key] = _compute_file_hash(path, buff_size)
+        return out
+
+
+def _compute_file_hash(path: str | Path, buff_size: int = 65536) -> str:
     import hashlib
 
-    md5 = hashlib.md5()
     with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            # python >= 3.11: read loop runs in C
+            return hashlib.file_digest(f, "blake2b").hexdigest()  # type: ignore
+
+        h = hashlib.blake2b()
         while True:
             data = f.read(buff_size)
             if not data:
                 break
-            md5.update(data)
-    return md5.hexdigest()
+            h.update(data)
+    return h.hexdigest()
 
 
 # * Old stuff --------------------------------------------------------------------------